@@ -3,6 +3,7 @@ import os
 import subprocess
 import sys
 import shutil
+import functools
 try:
     import customtkinter as ctk
     from tkinter import messagebox
@@ -16,7 +17,7 @@ except Exception:
         def showinfo(title, msg):
             print(f"INFO: {title}: {msg}")
     messagebox = _MsgBoxFallback()
-from typing import Dict, Any, List, Tuple, Set, Optional
+from typing import Dict, Any, List, Tuple, Set
 import argparse
 
 # Inlined from action_logger.py
@@ -37,13 +38,9 @@ class ActionLogger:
         except Exception:
             pass
 
-_default_logger: Optional[ActionLogger] = None
-
+@functools.lru_cache(maxsize=None)
 def get_logger(log_path: str) -> ActionLogger:
-    global _default_logger
-    if _default_logger is None or _default_logger.log_file != log_path:
-        _default_logger = ActionLogger(log_path)
-    return _default_logger
+    return ActionLogger(log_path)
 
 # Set appearance mode and color theme (if GUI available)
 if ctk:
@@ -184,37 +181,14 @@ class CommandBoardApp(ctk.CTk if ctk else object):
                 desc_label = ctk.CTkLabel(scroll_frame, text=desc, text_color="gray50")
                 desc_label.pack(anchor='w', padx=10, pady=(5,10))
             
-            subgroups = group.get('subgroups')
-            if subgroups:
-                for sg in subgroups:
-                    sg_name = sg.get('name', 'subgroup')
+            for sg_name, commands in iter_subgroups(group):
+                if sg_name is not None:
                     # Subgroup header
                     header = ctk.CTkLabel(scroll_frame, text=sg_name, font=ctk.CTkFont(size=16, weight="bold"))
                     header.pack(anchor='w', padx=10, pady=(15,5))
-                    
-                    for cmd in sg.get('commands', []):
-                        if not cmd.get('enabled', True):
-                            continue
-                        label = cmd.get('label', 'Unnamed')
-                        actions = cmd.get('actions', [])
-                        
-                        # Command row frame
-                        row = ctk.CTkFrame(scroll_frame, fg_color="transparent")
-                        row.pack(anchor='w', fill='x', padx=15, pady=3)
-                        
-                        # Command label
-                        cmd_label = ctk.CTkLabel(row, text=label, width=self.button_width*4, anchor='w')
-                        cmd_label.pack(side='left', padx=(0,10))
-                        
-                        # Action buttons
-                        for act in actions:
-                            act_name = act.get('name', 'action')
-                            btn = ctk.CTkButton(row, text=act_name, width=60,
-                                              font=ctk.CTkFont(weight="bold", size=12),
-                                              command=lambda a=act, base=cmd, lab=(group_name, sg_name, label, act_name): self.execute_action(base, a, lab))
-                            btn.pack(side='left', padx=3)
-            else:
-                for cmd in group.get('commands', []):
+                row_padx = 15 if sg_name is not None else 10
+                
+                for cmd in commands:
                     if not cmd.get('enabled', True):
                         continue
                     label = cmd.get('label', 'Unnamed')
@@ -222,7 +196,7 @@ class CommandBoardApp(ctk.CTk if ctk else object):
                     
                     # Command row frame
                     row = ctk.CTkFrame(scroll_frame, fg_color="transparent")
-                    row.pack(anchor='w', fill='x', padx=10, pady=3)
+                    row.pack(anchor='w', fill='x', padx=row_padx, pady=3)
                     
                     # Command label
                     cmd_label = ctk.CTkLabel(row, text=label, width=self.button_width*4, anchor='w')
@@ -233,7 +207,7 @@ class CommandBoardApp(ctk.CTk if ctk else object):
                         act_name = act.get('name', 'action')
                         btn = ctk.CTkButton(row, text=act_name, width=60,
                                           font=ctk.CTkFont(weight="bold", size=12),
-                                          command=lambda a=act, base=cmd, lab=(group_name, None, label, act_name): self.execute_action(base, a, lab))
+                                          command=lambda a=act, base=cmd, lab=(group_name, sg_name, label, act_name): self.execute_action(base, a, lab))
                         btn.pack(side='left', padx=3)
 
         # Settings Tab
@@ -426,30 +400,32 @@ def load_config(path: str) -> Dict[str, Any]:
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+def iter_subgroups(group: Dict[str, Any]):
+    """Yield (subgroup_name, commands) for a group.
+
+    A group without subgroups is treated as a single unnamed subgroup
+    (name None) so callers only need one code path.
+    """
+    subgroups = group.get('subgroups')
+    if subgroups:
+        for sg in subgroups:
+            yield sg.get('name', 'subgroup'), sg.get('commands', [])
+    else:
+        yield None, group.get('commands', [])
+
 def iter_commands(config: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
     out: List[Tuple[str, Dict[str, Any]]] = []
     for group in config.get('groups', []):
         gname = group.get('name', 'Group')
-        subgroups = group.get('subgroups')
-        if subgroups:
-            for sg in subgroups:
-                sgname = sg.get('name', 'subgroup')
-                for cmd in sg.get('commands', []):
-                    if not cmd.get('enabled', True):
-                        continue
-                    label = cmd.get('label', 'Unnamed')
-                    for act in cmd.get('actions', []):
-                        act_name = act.get('name', 'action')
-                        full_label = f"{gname}/{sgname}/{label}/{act_name}"
-                        out.append((full_label, {'_base': cmd, '_action': act}))
-        else:
-            for cmd in group.get('commands', []):
+        for sgname, commands in iter_subgroups(group):
+            prefix = f"{gname}/{sgname}" if sgname is not None else gname
+            for cmd in commands:
                 if not cmd.get('enabled', True):
                     continue
                 label = cmd.get('label', 'Unnamed')
                 for act in cmd.get('actions', []):
                     act_name = act.get('name', 'action')
-                    full_label = f"{gname}/{label}/{act_name}"
+                    full_label = f"{prefix}/{label}/{act_name}"
                     out.append((full_label, {'_base': cmd, '_action': act}))
     return out
 
@@ -547,16 +523,8 @@ def validate_config(config: Dict[str, Any], logger=None) -> Dict[str, Any]:
                         logger.log('CONFIG_TEST_EXEC_CHECK', f'{exe} | {found} | OK', status='OK')
     base_signatures: Set[str] = set()
     for group in config.get('groups', []):
-        subgroups = group.get('subgroups')
-        if subgroups:
-            for sg in subgroups:
-                for cmd in sg.get('commands', []):
-                    if not cmd.get('enabled', True):
-                        continue
-                    sig = f"{cmd.get('label')}"
-                    base_signatures.add(sig)
-        else:
-            for cmd in group.get('commands', []):
+        for _, commands in iter_subgroups(group):
+            for cmd in commands:
                 if not cmd.get('enabled', True):
                     continue
                 sig = f"{cmd.get('label')}"
@@ -612,12 +580,13 @@ def main(argv: List[str]):
     except Exception as e:
         print(f'Failed to load config: {e}', file=sys.stderr)
         sys.exit(1)
+    settings = config.get('settings', {})
+    log_path = resolve_log_path(settings)
 
     if getattr(args, 'test_config', False):
         # Perform validation only (CLI mode) with logging
-        settings = config.get('settings', {})
         record_log = settings.get('recordLog', False)
-        logger = get_logger(resolve_log_path(settings))
+        logger = get_logger(log_path)
         if record_log:
             logger.log('CONFIG_TEST', 'cli started', status='INFO')
         report = validate_config(config, logger=logger if record_log else None)
@@ -690,23 +659,20 @@ def main(argv: List[str]):
         cmd_str = build_command_string(build_def)
         if args.dry_run:
             print(f'DRY RUN: {cmd_str}')
-            settings = config.get('settings', {})
             if settings.get('recordLog', False):
-                logger = get_logger(resolve_log_path(settings))
+                logger = get_logger(log_path)
                 logger.log('CLI_DRY_RUN', f'{label} -> {cmd_str}', status='INFO')
             return
         try:
             subprocess.Popen(cmd_str, shell=True)
             print(f'Executed: {cmd_str}')
-            settings = config.get('settings', {})
             if settings.get('recordLog', False):
-                logger = get_logger(resolve_log_path(settings))
+                logger = get_logger(log_path)
                 logger.log('CLI_EXECUTE', f'{label} -> {cmd_str}', status='OK')
         except Exception as e:
             print(f'Execution failed: {e}', file=sys.stderr)
-            settings = config.get('settings', {})
             if settings.get('recordLog', False):
-                logger = get_logger(resolve_log_path(settings))
+                logger = get_logger(log_path)
                 logger.log('CLI_EXECUTE', f'{label} ERROR {e}', status='ERROR')
             sys.exit(3)
         return
@@ -8,53 +8,65 @@ pip install matplotlib
 """
 
 import os
+import sys
 import csv
 import argparse
+import heapq
+import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
 import textwrap
 from datetime import datetime
-from io import StringIO
+from functools import cached_property
 
 # Global debug flag
 DEBUG_MODE = False
 
+# Above this many regions the per-region legend is skipped (it dominates savefig time and is unreadable)
+MAX_LEGEND_ENTRIES = 30
+
+def is_headless():
+    """Return True when no display is available for an interactive plot window"""
+    if sys.platform.startswith('win') or sys.platform == 'darwin':
+        return False
+    return not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+def _filter_csv_lines(lines):
+    """Yield CSV lines with inline comments and all spaces removed, skipping empty lines"""
+    for line in lines:
+        # Remove inline comments (everything after #)
+        i = line.find('#')
+        if i >= 0:
+            line = line[:i]
+
+        # Remove all spaces and strip
+        line = line.replace(' ', '').strip()
+        if line:  # Only yield non-empty lines
+            if DEBUG_MODE:
+                print(line)
+            yield line
+
 def load_regions_from_csv(csv_file):
     """Load memory regions from CSV file"""
     raw_regions = []
     try:
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            # Filter out comment lines and remove inline comments and all spaces
-            filtered_lines = []
-            for line in f:
-                # Remove inline comments (everything after #)
-                if '#' in line:
-                    line = line[:line.index('#')]
-                
-                # Remove all spaces and strip
-                cleaned_line = line.replace(' ', '').strip()
-                if cleaned_line:  # Only add non-empty lines
-                    filtered_lines.append(cleaned_line + '\n')
-            
-            # Create CSV reader from filtered lines
-            csv_content = ''.join(filtered_lines)
-            if DEBUG_MODE:
-                print(csv_content)
-            csv_file_obj = StringIO(csv_content)
-            
-            reader = csv.DictReader(csv_file_obj)
-            
+        with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+            # Single pass: filter lines on the fly and read rows as tuples
+            reader = csv.reader(_filter_csv_lines(f))
+            header = next(reader, None)
+            if header is None:
+                return []
+            gi, ni, ai, si = (header.index(col) for col in ('group', 'name', 'address', 'size'))
+
             for row in reader:
-                group = row['group']
-                name = row['name']
-                address = int(row['address'], 16)  # Convert hex string to int
-                size = int(row['size'], 16)        # Convert hex string to int
-                raw_regions.append((group, name, address, size))
+                address = int(row[ai], 16)  # Convert hex string to int
+                size = int(row[si], 16)     # Convert hex string to int
+                raw_regions.append((row[gi], row[ni], address, size))
                 
     except FileNotFoundError:
         print(f"Error: CSV file '{csv_file}' not found.")
         return []
-    except ValueError as e:
+    except (ValueError, IndexError) as e:
         print(f"Error parsing CSV data: {e}")
         return []
     return raw_regions
@@ -66,80 +78,103 @@ class Region:
         self.size = size
         self.end = addr + size
         self.group = group
-        self.log2size = self._log2(size) if size > 0 else 0
+        self.wrapped_name = textwrap.fill(name, width=10)  # label drawn inside the bar
+        self.log2size = size.bit_length() - 1 if size > 0 else 0  # floor(log2(size))
         self.track = 0
 
-    def _log2(self, n):
-        # Bitwise calculation of log2
-        r = 0
-        while n > 1:
-            n >>= 1
-            r += 1
-        return r
-
 class MemoryMapManager:
     ALIGN_WIDTH = 15
     
     def __init__(self, raw_regions):        
         self.regions = [Region(group, name, addr, size) for group, name, addr, size in raw_regions]
-        self.groups = list(dict.fromkeys(r.group for r in self.regions))
+        self._by_group = {}
+        for r in self.regions:
+            self._by_group.setdefault(r.group, []).append(r)
+        self.groups = list(self._by_group)
+        
+        # Region fields as parallel arrays (indexed like self.regions) for vectorized layout math
+        n = len(self.regions)
+        group_index = {g: i for i, g in enumerate(self.groups)}
+        # int64 covers the usual address range; regions at or above 2^63 (e.g. 0xFFFFFFFF80000000)
+        # fall back to object arrays of Python ints so the math stays exact instead of overflowing
+        top = max((max(r.addr, r.end, r.size) for r in self.regions), default=0)
+        addr_dtype = np.int64 if top <= np.iinfo(np.int64).max else object
+        self.addrs = np.array([r.addr for r in self.regions], dtype=addr_dtype)
+        self.sizes = np.array([r.size for r in self.regions], dtype=addr_dtype)
+        self.ends = np.array([r.end for r in self.regions], dtype=addr_dtype)
+        self.group_ids = np.fromiter((group_index[r.group] for r in self.regions), dtype=np.int64, count=n)
         
         self._calculate_y_coordinates()
         self._calculate_tracks()
         self._calculate_group_base_x()
+        self._calculate_plot_coordinates()
     
     def _calculate_y_coordinates(self):
         """Calculate Y-axis coordinate compression"""
-        key_addresses = set()
-        for r in self.regions:
-            key_addresses.add(r.addr)
-            key_addresses.add(r.end)
-        self.sorted_key_addresses = sorted(list(key_addresses))
-        self.addr_to_compressed_y = {addr: i for i, addr in enumerate(self.sorted_key_addresses)}
+        # Compressed Y of an address is its index in sorted_key_addresses
+        self.sorted_key_addresses = np.unique(np.concatenate([self.addrs, self.ends]))
+        self.compressed_y = np.arange(len(self.sorted_key_addresses))
     
     def _calculate_tracks(self):
-        """Calculate track position for each region to avoid overlap"""
+        """Calculate track position for each region to avoid overlap (interval partitioning)"""
         for group_name in self.groups:
-            group_regs = self.get_regions_by_group(group_name)
-            tracks = []
+            group_regs = sorted(self.get_regions_by_group(group_name), key=lambda r: r.addr)
+            active = []       # min-heap of (end address, track) for tracks in use
+            free_tracks = []  # min-heap of track indexes whose last region has ended
+            track_count = 0
             
             for reg in group_regs:
-                # Find non-overlapping track starting from track 0
-                placed = False
-                for t, track_end_list in enumerate(tracks):
-                    # Check if it overlaps with all regions in this track
-                    overlap = any(not (reg.end <= r.addr or reg.addr >= r.end) for r in track_end_list)
-                    if not overlap:
-                        reg.track = t
-                        track_end_list.append(reg)
-                        placed = True
-                        break
-                if not placed:
-                    reg.track = len(tracks)
-                    tracks.append([reg])
+                # Release every track whose last region ends at or before this one starts
+                while active and active[0][0] <= reg.addr:
+                    heapq.heappush(free_tracks, heapq.heappop(active)[1])
+                
+                # Reuse the lowest free track, otherwise open a new one
+                if free_tracks:
+                    reg.track = heapq.heappop(free_tracks)
+                else:
+                    reg.track = track_count
+                    track_count += 1
+                heapq.heappush(active, (reg.end, reg.track))
     
     def _calculate_group_base_x(self):
         """Calculate base X position for each group, considering track count"""
         self.group_base_x = {}
+        self._group_max_track = {}
         current_x = 0
         
         for group_name in self.groups:
             self.group_base_x[group_name] = current_x
             group_regs = self.get_regions_by_group(group_name)
             max_track = max(r.track for r in group_regs) if group_regs else 0
+            self._group_max_track[group_name] = max_track
             current_x += max_track + 1
     
+    def _calculate_plot_coordinates(self):
+        """Precompute bar X position, Y start and Y height for each region (indexed like self.regions)"""
+        self.tracks = np.fromiter((r.track for r in self.regions), dtype=np.int64, count=len(self.regions))
+        group_base = np.array([self.group_base_x[g] for g in self.groups], dtype=np.int64)
+        self.x_pos = group_base[self.group_ids] + self.tracks
+        self.y_start = np.searchsorted(self.sorted_key_addresses, self.addrs)
+        self.y_height = np.searchsorted(self.sorted_key_addresses, self.ends) - self.y_start
+        # Draw order: group by group (in first-seen order), regions keep their CSV order within a group
+        self.draw_order = np.argsort(self.group_ids, kind='stable')
+    
     def get_group_x_pos(self, group_name, track):
         return self.group_base_x[group_name] + track
     
     def get_group_separator_positions(self):
         return [(self.group_base_x[self.groups[i]] - 0.5) for i in range(1, len(self.groups))]
     
-    def get_x_limits(self):
+    @cached_property
+    def x_limits(self):
+        """X-axis limits (left, right), computed once since the layout is fixed after __init__"""
         min_x = min(self.group_base_x.values())
-        max_x = max(self.group_base_x.values()) + max(r.track for r in self.regions)
+        max_x = max(self.group_base_x[g] + self._group_max_track[g] for g in self.groups)
         return min_x - 0.5, max_x + 0.5
 
+    def get_x_limits(self):
+        return self.x_limits
+
     def debug_print(self):
         print("=== Memory Map Manager Debug Info ===")
         print(f"{'groups':<{self.ALIGN_WIDTH}}: {self.groups}")
@@ -170,7 +205,7 @@ class MemoryMapManager:
 
     def get_regions_by_group(self, group_name):
         """Return all regions matching group_name"""
-        return [r for r in self.regions if r.group == group_name]
+        return self._by_group.get(group_name, [])
 
     def get_total_track_num(self):
         """
@@ -179,7 +214,7 @@ class MemoryMapManager:
         """
         if not self.regions:
             return 0
-        return max(self.group_base_x[r.group] + r.track for r in self.regions) + 1
+        return int(self.x_pos.max()) + 1
 
 def human_size(n: int) -> str:
     """
@@ -209,9 +244,16 @@ def main():
                        help='CSV file containing memory region data (default: memory_map_visualizer.csv)')
     parser.add_argument('--debug', '-d', action='store_true',
                        help='Print debug information including filtered CSV content')
+    parser.add_argument('--no-show', action='store_true',
+                       help='Never open the interactive plot window (debug mode opens it by default)')
     args = parser.parse_args()
     
     DEBUG_MODE = args.debug
+    show_plot = DEBUG_MODE and not args.no_show and not is_headless()
+
+    # Render off-screen unless a window will be shown; an explicit MPLBACKEND always wins
+    if not show_plot and not os.environ.get('MPLBACKEND'):
+        matplotlib.use('Agg')
     
     raw_regions = load_regions_from_csv(args.file)
     if not raw_regions:
@@ -226,30 +268,32 @@ def main():
     fig_width = 7 + manager.get_total_track_num() # 7 inches for surrounding layout, 1 inch per track
     fig, ax = plt.subplots(figsize=(fig_width, 10)) # (width, height) in inches, DPI=150
 
-    # 3. Draw bars by group
-    for group_name in manager.groups:
-        group_regs = manager.get_regions_by_group(group_name)
-
-        for reg in group_regs:
-            x_pos = manager.get_group_x_pos(group_name, reg.track)
-            y_start = manager.addr_to_compressed_y[reg.addr]
-            y_height = manager.addr_to_compressed_y[reg.end] - manager.addr_to_compressed_y[reg.addr]
-
-            ax.bar(
-                x=x_pos,
-                height=y_height,
-                bottom=y_start,
-                width=0.9,
-                alpha=0.6,
-                label=f"0x{reg.addr:08X}~0x{reg.end:08X}"
-                      f"{f'({human_size(reg.size)})':>8} "
-                      f"<{reg.group}> "
-                      f"{reg.name}"
-            )
-
-            ax.text(x_pos, y_start + y_height / 2, textwrap.fill(reg.name, width=10),
-                    ha='center', va='center', color='black',
-                    fontsize=10) # fontweight='bold'
+    # 3. Draw all bars with a single call, group by group
+    order = manager.draw_order
+    xs = manager.x_pos[order]
+    bottoms = manager.y_start[order]
+    heights = manager.y_height[order]
+    # One colour per bar from the property cycle, as separate bar() calls would get
+    cycle_colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    colors = [cycle_colors[k % len(cycle_colors)] for k in range(len(order))]
+
+    bars = ax.bar(xs, heights, bottom=bottoms, width=0.9, alpha=0.6, color=colors)
+    # Rasterize the data patches only; axes, labels and legend stay vector in PDF/SVG output
+    for patch in bars:
+        patch.set_rasterized(True)
+
+    show_legend = len(manager.regions) <= MAX_LEGEND_ENTRIES
+    for i, patch, x_pos, y_start, y_height in zip(order, bars, xs, bottoms, heights):
+        reg = manager.regions[i]
+        if show_legend:
+            patch.set_label(f"0x{reg.addr:08X}~0x{reg.end:08X}"
+                            f"{f'({human_size(reg.size)})':>8} "
+                            f"<{reg.group}> "
+                            f"{reg.name}")
+
+        ax.text(x_pos, y_start + y_height / 2, reg.wrapped_name,
+                ha='center', va='center', color='black',
+                fontsize=10) # fontweight='bold'
 
     # Group separator lines
     for xpos in manager.get_group_separator_positions():
@@ -258,18 +302,13 @@ def main():
     # --- Draw horizontal grid lines ---
     x_limit_start, x_limit_end = manager.get_x_limits()
 
-    for y_coord in manager.addr_to_compressed_y.values():
-        ax.hlines(y_coord, xmin=x_limit_start, xmax=x_limit_end,
-                color='gray', linestyle='--', linewidth=0.5, alpha=0.6)
+    # One call with all Y values -> a single LineCollection instead of one per line
+    ax.hlines(manager.compressed_y, xmin=x_limit_start, xmax=x_limit_end,
+              color='gray', linestyle='--', linewidth=0.5, alpha=0.6)
 
     # --- Y-axis (address) setup ---
-    def format_addr(compressed_y, pos):
-        if 0 <= compressed_y < len(manager.sorted_key_addresses):
-            return hex(manager.sorted_key_addresses[int(compressed_y)])
-        return ''
-
-    ax.set_yticks(list(manager.addr_to_compressed_y.values()))
-    ax.yaxis.set_major_formatter(ticker.FuncFormatter(format_addr))
+    ax.set_yticks(manager.compressed_y)
+    ax.set_yticklabels([f"0x{addr:x}" for addr in manager.sorted_key_addresses.tolist()])
 
     # --- X-axis (track) setup ---
     ax.set_xticks([manager.group_base_x[g] for g in manager.groups])
@@ -280,7 +319,10 @@ def main():
     ax.set_ylim(-0.5, len(manager.sorted_key_addresses) - 0.5)
 
     ax.set_title("Memory Map", fontsize=14)
-    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left', title="Regions (Address & Approx. Size)")
+    if show_legend:
+        ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left', title="Regions (Address & Approx. Size)")
+    else:
+        print(f"Legend skipped: {len(manager.regions)} regions (limit {MAX_LEGEND_ENTRIES}), use --debug for the region list")
 
     plt.tight_layout()
     
@@ -290,7 +332,7 @@ def main():
     plt.savefig(output_file, dpi=150)
     print(f"Memory map saved to: {os.path.abspath(output_file)}")
     
-    if DEBUG_MODE:
+    if show_plot:
         plt.show()
 
 if __name__ == "__main__":
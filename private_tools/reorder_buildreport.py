@@ -13,58 +13,168 @@ Output:
     BuildReport-reorder_driver_and_lib.txt (modules and libraries reordered)
 """
 
+import os
 import sys
 import re
+import mmap
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
+# Precompiled pattern (reports are parsed as bytes)
+# Library: .inf line followed by {LibName: ...} line (which may span multiple lines)
+# The library info starts with { and ends with }, and may continue on the next line if indented with a space
+_LIB_BLOCK_RE = re.compile(rb'^([^\r\n]+\.inf)\r?\n(\{[^}]+\})', re.MULTILINE)
+
+# Library reordering runs in a process pool once this many modules need it
+PARALLEL_MIN_MODULES = 500
+
+
+def parse_libraries(lib_section):
+    """Parse the libraries of a library section, in their original order."""
+    libs = []
+    for match in _LIB_BLOCK_RE.finditer(lib_section):
+        lib_path = match.group(1)
+        lib_info = match.group(2)
+        
+        libs.append({
+            'path': lib_path,
+            # Normalize path for comparison
+            'normalized_path': lib_path.replace(b'\\', b'/').lower(),
+            'info': lib_info
+        })
+    return libs
+
+
+def reorder_library_section(lib_parts, ref_paths, newline, lib_section_marker, lib_section_end, current_libs=None):
+    """
+    Reorder the libraries of one module to follow the reference path order.
+    
+    This is a free function so it can run in a worker process.
+    
+    Args:
+        lib_parts: (before_lib, lib_section, after_lib) of the module
+        ref_paths: Normalized library paths of the same module in the reference report
+        newline: Line ending of the report
+        lib_section_marker, lib_section_end: Library section markers of the report
+        current_libs: Already parsed libraries of lib_section (parsed here if None)
+    
+    Returns:
+        (module_content, lib_count); module_content is None when the module is unchanged,
+        lib_count is the number of libraries in the written section
+    """
+    before_lib_section, lib_section, after_lib_section = lib_parts
+    
+    # Extract all libraries from current module (preserve original order)
+    if current_libs is None:
+        current_libs = parse_libraries(lib_section)
+    
+    if not current_libs or not ref_paths:
+        return None, len(current_libs)
+    
+    # Reorder libraries based on reference
+    reordered_libs = []
+    
+    # Index current libraries by normalized path (duplicates keep their original order)
+    buckets = defaultdict(deque)
+    for i, curr_lib in enumerate(current_libs):
+        buckets[curr_lib['normalized_path']].append(i)
+    
+    # Match by exact path and add in reference order
+    used = bytearray(len(current_libs))
+    for ref_path in ref_paths:
+        indices = buckets.get(ref_path)
+        if indices:
+            i = indices.popleft()
+            reordered_libs.append(current_libs[i])
+            used[i] = 1
+    
+    # Add remaining libraries (not in reference) in their original order
+    reordered_libs.extend(lib for lib, is_used in zip(current_libs, used) if not is_used)
+    
+    # Already in reference order: keep the module untouched
+    if all(a is b for a, b in zip(reordered_libs, current_libs)):
+        return None, len(current_libs)
+    
+    # Rebuild lib section with reordered libraries
+    nl = newline
+    new_lib_section = nl.join(lib['path'] + nl + lib['info'] for lib in reordered_libs)
+    if new_lib_section:
+        new_lib_section = nl + new_lib_section + nl
+    
+    # Count libraries in the rebuilt section so the caller can check nothing was lost
+    lib_count = len(_LIB_BLOCK_RE.findall(new_lib_section))
+    
+    return before_lib_section + lib_section_marker + new_lib_section + lib_section_end + after_lib_section, lib_count
+
+
+def _write_all(fd, data):
+    """Write all of data to fd, retrying on partial writes."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
 
 class BuildReport:
     """Represents a build report with header and modules."""
     
     MODULE_SEPARATOR = ">======================================================================================================================================================================================================<"
     MODULE_HEADER = "Module Summary"
+    LIB_SECTION_MARKER = ">------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------<\nLibrary\n--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------"
+    LIB_SECTION_END = "<------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------>"
     
     def __init__(self, filepath):
         self.filepath = Path(filepath)
-        self.header = ""
-        self.modules = {}  # dict: module_name -> module_content
+        self.header = b""
+        self.newline = b"\n"  # line ending used by the file (b"\r\n" for CRLF reports)
+        self.modules = {}  # dict: module_name -> module_content (bytes)
+        self.module_ranges = {}  # dict: module_name -> (offset, length) in the input file
         self.module_order = []  # list of module names in order
+        self.lib_sections = {}  # dict: module_name -> (before_lib, lib_section, after_lib) or None
+        self._lib_cache = {}  # dict: module_name -> list of parsed library dicts
         self._parse()
     
     def _parse(self):
-        """Parse the build report file."""
-        with open(self.filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        """Parse the build report file through a read-only memory map."""
+        with open(self.filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"No modules found in {self.filepath}")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self._parse_mapped(mm)
         
-        # Find the first module section
-        pattern = f"{re.escape(self.MODULE_SEPARATOR)}\n{re.escape(self.MODULE_HEADER)}"
-        match = re.search(pattern, content)
+        print(f"Parsed {self.filepath.name}: {len(self.modules)} modules found")
+    
+    def _parse_mapped(self, mm):
+        """Split the mapped file into header and module blocks."""
+        # Keep the file's own line ending so CRLF reports parse and round-trip unchanged
+        first_nl = mm.find(b'\n')
+        if first_nl > 0 and mm[first_nl - 1:first_nl] == b'\r':
+            self.newline = b'\r\n'
+        nl = self.newline
+        self.lib_section_marker = self.LIB_SECTION_MARKER.encode().replace(b'\n', nl)
+        self.lib_section_end = self.LIB_SECTION_END.encode()
+        sep = self.MODULE_SEPARATOR.encode() + nl + self.MODULE_HEADER.encode()
+        
+        # Find all module start positions in a single pass over the map
+        module_starts = []
+        pos = mm.find(sep)
+        while pos >= 0:
+            module_starts.append(pos)
+            pos = mm.find(sep, pos + len(sep))
         
-        if not match:
+        if not module_starts:
             raise ValueError(f"No modules found in {self.filepath}")
         
         # Extract header (everything before first module)
-        first_module_start = match.start()
-        self.header = content[:first_module_start].rstrip('\n')
-        
-        # Extract modules
-        modules_section = content[first_module_start:]
-        
-        # Find all module start positions
-        separator_pattern = re.escape(self.MODULE_SEPARATOR) + r'\n' + re.escape(self.MODULE_HEADER)
-        module_starts = []
-        for match in re.finditer(separator_pattern, modules_section):
-            module_starts.append(match.start())
+        self.header = mm[:module_starts[0]].rstrip(b'\r\n')
         
         # Extract each module block
+        module_starts.append(len(mm))
         module_name_count = {}  # Track duplicate module names
-        for i, start_pos in enumerate(module_starts):
-            if i + 1 < len(module_starts):
-                end_pos = module_starts[i + 1]
-            else:
-                end_pos = len(modules_section)
-            
-            block = modules_section[start_pos:end_pos]
+        for start_pos, end_pos in zip(module_starts, module_starts[1:]):
+            block = mm[start_pos:end_pos]
             
             # Extract module name
             module_name = self._extract_module_name(block)
@@ -78,17 +188,45 @@ class BuildReport:
                     unique_key = module_name
                 
                 self.modules[unique_key] = block
+                self.module_ranges[unique_key] = (start_pos, end_pos - start_pos)
                 self.module_order.append(unique_key)
-        
-        print(f"Parsed {self.filepath.name}: {len(self.modules)} modules found")
+                # Library markers can only appear after the separator + header prefix
+                self.lib_sections[unique_key] = self._split_lib_section(block, len(sep))
     
     def _extract_module_name(self, module_block):
         """Extract the module name from a module block."""
-        # Look for "Module Name: <name>"
-        match = re.search(r'Module Name:\s+(\S+)', module_block)
-        if match:
-            return match.group(1)
-        return None
+        # Look for "Module Name: <name>" (plain find, it always appears early in the block)
+        idx = module_block.find(b'Module Name:')
+        if idx < 0:
+            return None
+        line_end = module_block.find(b'\n', idx)
+        if line_end < 0:
+            line_end = len(module_block)
+        tail = module_block[idx + len(b'Module Name:'):line_end].split()
+        return tail[0].decode('utf-8', errors='ignore') if tail else None
+    
+    def _split_lib_section(self, module_block, start=0):
+        """
+        Split a module block around its library section.
+        
+        Args:
+            module_block: Full module text
+            start: Offset to start searching for the library section marker
+        
+        Returns:
+            (before_lib, lib_section, after_lib) tuple, or None if the module has no library section
+        """
+        # Locate the markers by offset and slice once, instead of splitting (copying) the block twice
+        i = module_block.find(self.lib_section_marker, start)
+        if i < 0:
+            return None
+        
+        lib_start = i + len(self.lib_section_marker)
+        j = module_block.find(self.lib_section_end, lib_start)
+        if j < 0:
+            return None
+        
+        return module_block[:i], module_block[lib_start:j], module_block[j + len(self.lib_section_end):]
     
     def reorder_modules(self, reference_order):
         """
@@ -119,183 +257,173 @@ class BuildReport:
         return new_order
     
     def save(self, output_path, reorder_libraries=False, reference_report=None):
-        """Save the build report to a file."""
-        output_path = Path(output_path)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # Write header
-            f.write(self.header)
-            f.write('\n')
-            
-            # Write modules in order
-            total = len(self.module_order)
-            for idx, module_name in enumerate(self.module_order, 1):
-                if reorder_libraries and idx % 50 == 0:
-                    print(f"  Processing module {idx}/{total}...")
-                
-                f.write('\n')
-                module_content = self.modules[module_name]
-                
-                if reorder_libraries and reference_report:
-                    # Reorder libraries within this module
-                    module_content = self._reorder_libraries_in_module(
-                        module_content, 
-                        module_name, 
-                        reference_report
-                    )
-                
-                f.write(module_content)
-        
-        print(f"Saved reordered report to {output_path}")
-    
-    def get_library_count(self, module_name):
-        """Get the number of libraries in a specific module."""
-        if module_name not in self.modules:
-            return 0
-        
-        module_content = self.modules[module_name]
-        lib_section_marker = ">------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------<\nLibrary\n--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------"
-        lib_section_end = "<------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------>"
-        
-        if lib_section_marker not in module_content or lib_section_end not in module_content:
-            return 0
-        
-        parts = module_content.split(lib_section_marker, 1)
-        if len(parts) != 2:
-            return 0
-        
-        remaining = parts[1]
-        lib_parts = remaining.split(lib_section_end, 1)
-        if len(lib_parts) < 1:
-            return 0
-        
-        lib_section = lib_parts[0]
-        # Pattern updated to handle multi-line library info (same as in _reorder_libraries_in_module)
-        lib_pattern = re.compile(r'^([^\n]+\.inf)\n(\{[^}]+\})', re.MULTILINE)
-        
-        return len(lib_pattern.findall(lib_section))
-    
-    def _reorder_libraries_in_module(self, module_content, module_name, reference_report):
-        """Reorder libraries within a module based on reference report."""
-        # Find the library section header
-        lib_section_marker = ">------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------<\nLibrary\n--------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------"
-        lib_section_end = "<------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------>"
-        
-        if lib_section_marker not in module_content or lib_section_end not in module_content:
-            return module_content
-        
-        # Split into: before_lib_section, lib_section, after_lib_section
-        parts = module_content.split(lib_section_marker, 1)
-        if len(parts) != 2:
-            return module_content
+        """
+        Save the build report to a file.
         
-        before_lib_section = parts[0]
-        remaining = parts[1]
+        Returns:
+            Dict of module name -> (library count, byte length) as written, in output order
+        """
+        output_path = Path(output_path)
         
-        # Split lib section and what comes after
-        lib_parts = remaining.split(lib_section_end, 1)
-        if len(lib_parts) != 2:
-            return module_content
+        # sendfile() to a regular file only works on Linux (BSD/macOS require a socket), same guard as shutil
+        if not reorder_libraries and hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+            # Modules are written verbatim: splice them straight from the input file
+            self._save_passthrough(output_path)
+            print(f"Saved reordered report to {output_path}")
+            return {module_name: (self.get_library_count(module_name), self.module_ranges[module_name][1])
+                    for module_name in self.module_order}
         
-        lib_section = lib_parts[0]
-        after_lib_section = lib_parts[1]
+        reordered = {}
+        if reorder_libraries and reference_report:
+            reordered = self._reorder_all_libraries(reference_report)
         
-        # Pattern: .inf line followed by {LibName: ...} line (which may span multiple lines)
-        # The library info starts with { and ends with }, and may continue on the next line if indented with a space
-        lib_pattern = re.compile(r'^([^\n]+\.inf)\n(\{[^}]+\})', re.MULTILINE)
+        # Header, then each module preceded by a blank line
+        parts = [self.header, b'']
+        written = {}
         
-        # Extract all libraries from current module (preserve original order)
-        current_libs = []
-        for match in lib_pattern.finditer(lib_section):
-            lib_path = match.group(1)
-            lib_info = match.group(2)
-            lib_name = self._extract_library_name(lib_info)
+        # Collect modules in order
+        for module_name in self.module_order:
+            module_content = self.modules[module_name]
             
-            # Normalize path for comparison
-            normalized_path = lib_path.replace('\\', '/').lower()
+            if module_name in reordered:
+                new_content, lib_count = reordered[module_name]
+                if new_content is not None:
+                    module_content = new_content
+            else:
+                lib_count = self.get_library_count(module_name)
             
-            current_libs.append({
-                'path': lib_path,
-                'normalized_path': normalized_path,
-                'name': lib_name,
-                'info': lib_info,
-                'full': f"{lib_path}\n{lib_info}"
-            })
-        
-        if not current_libs:
-            return module_content
+            parts.append(module_content)
+            written[module_name] = (lib_count, len(module_content))
         
-        # Get reference library order from the same module in reference report
-        ref_libs = []
-        if module_name in reference_report.modules:
-            ref_module = reference_report.modules[module_name]
-            if lib_section_marker in ref_module:
-                ref_parts = ref_module.split(lib_section_marker, 1)
-                if len(ref_parts) == 2:
-                    ref_remaining = ref_parts[1]
-                    ref_lib_parts = ref_remaining.split(lib_section_end, 1)
-                    if len(ref_lib_parts) >= 1:
-                        ref_lib_section = ref_lib_parts[0]
-                        
-                        for match in lib_pattern.finditer(ref_lib_section):
-                            lib_path = match.group(1)
-                            lib_info = match.group(2)
-                            lib_name = self._extract_library_name(lib_info)
-                            
-                            normalized_path = lib_path.replace('\\', '/').lower()
-                            
-                            ref_libs.append({
-                                'path': lib_path,
-                                'normalized_path': normalized_path,
-                                'name': lib_name,
-                                'info': lib_info
-                            })
+        # Single write through a large buffer instead of two small writes per module
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            f.write(self.newline.join(parts))
         
-        if not ref_libs:
-            return module_content
+        print(f"Saved reordered report to {output_path}")
+        return written
+    
+    def _save_passthrough(self, output_path):
+        """
+        Write the header and modules in the current order, copying each module's
+        byte range from the input file with os.sendfile (same layout as save()).
+        """
+        nl = self.newline
+        with open(self.filepath, 'rb') as src, open(output_path, 'wb', buffering=0) as dst:
+            in_fd = src.fileno()
+            out_fd = dst.fileno()
+            _write_all(out_fd, self.header + nl)
+            for module_name in self.module_order:
+                offset, length = self.module_ranges[module_name]
+                _write_all(out_fd, nl)
+                while length > 0:
+                    sent = os.sendfile(out_fd, in_fd, offset, length)
+                    if sent == 0:
+                        raise OSError(f"Unexpected end of {self.filepath} while copying {module_name}")
+                    offset += sent
+                    length -= sent
+    
+    def _parse_libs(self, module_name):
+        """
+        Parse the libraries of a module, in their original order.
         
-        # Reorder libraries based on reference
-        reordered_libs = []
-        used_indices = set()
+        The result is cached per module since the module content does not change after parsing.
+        """
+        libs = self._lib_cache.get(module_name)
+        if libs is not None:
+            return libs
         
-        # Match by exact path and add in reference order
-        for ref_lib in ref_libs:
-            for i, curr_lib in enumerate(current_libs):
-                if i not in used_indices and ref_lib['normalized_path'] == curr_lib['normalized_path']:
-                    reordered_libs.append(curr_lib)
-                    used_indices.add(i)
-                    break
+        lib_parts = self.lib_sections.get(module_name)
+        libs = parse_libraries(lib_parts[1]) if lib_parts is not None else []
         
-        # Add remaining libraries (not in reference) in their original order
-        for i, lib in enumerate(current_libs):
-            if i not in used_indices:
-                reordered_libs.append(lib)
+        self._lib_cache[module_name] = libs
+        return libs
+    
+    def get_library_count(self, module_name):
+        """Get the number of libraries in a specific module."""
+        return len(self._parse_libs(module_name))
+    
+    def _reorder_all_libraries(self, reference_report):
+        """
+        Reorder libraries of every module that has reference libraries.
         
-        # Rebuild lib section with reordered libraries
-        new_lib_section = '\n'.join(lib['full'] for lib in reordered_libs)
-        if new_lib_section:
-            new_lib_section = '\n' + new_lib_section + '\n'
+        Large reports are spread over a process pool; each module is independent.
         
-        return before_lib_section + lib_section_marker + new_lib_section + lib_section_end + after_lib_section
-    
-    def _extract_library_name(self, lib_info):
-        """Extract library name from {LibName: ...} format."""
-        match = re.search(r'\{([^:]+):', lib_info)
-        if match:
-            return match.group(1).strip()
-        return None
+        Returns:
+            Dict of module name -> (module_content or None if unchanged, lib_count)
+        """
+        # Only modules with a library section and reference libraries need work
+        jobs = []
+        for module_name in self.module_order:
+            lib_parts = self.lib_sections.get(module_name)
+            if lib_parts is None:
+                continue
+            ref_paths = [lib['normalized_path'] for lib in reference_report._parse_libs(module_name)]
+            if ref_paths:
+                jobs.append((module_name, lib_parts, ref_paths))
+        
+        total = len(jobs)
+        if total >= PARALLEL_MIN_MODULES:
+            workers = os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                outputs = executor.map(
+                    reorder_library_section,
+                    [job[1] for job in jobs],
+                    [job[2] for job in jobs],
+                    repeat(self.newline),
+                    repeat(self.lib_section_marker),
+                    repeat(self.lib_section_end),
+                    chunksize=max(1, total // (4 * workers))
+                )
+                results = {}
+                for idx, (job, output) in enumerate(zip(jobs, outputs), 1):
+                    if idx % 50 == 0:
+                        print(f"  Processing module {idx}/{total}...")
+                    results[job[0]] = output
+                return results
+        
+        results = {}
+        for idx, (module_name, lib_parts, ref_paths) in enumerate(jobs, 1):
+            if idx % 50 == 0:
+                print(f"  Processing module {idx}/{total}...")
+            results[module_name] = reorder_library_section(
+                lib_parts,
+                ref_paths,
+                self.newline,
+                self.lib_section_marker,
+                self.lib_section_end,
+                self._parse_libs(module_name)
+            )
+        return results
 
 
-def verify_report_integrity(original_report, output_file_path, description):
-    """Verify that the output file has the same structure as the original."""
+def verify_report_integrity(original_report, output_path, written_modules, description):
+    """
+    Verify that the saved output has the same structure as the original.
+    
+    Args:
+        original_report: The report that was saved
+        output_path: Path of the written output
+        written_modules: Dict of module name -> (library count, byte length) returned by save()
+        description: Name of the output shown in the log
+    """
     print(f"\nVerifying {description}...")
     
-    # Load the output file
-    output_report = BuildReport(output_file_path)
+    nl = original_report.newline
+    sep = original_report.MODULE_SEPARATOR.encode() + nl + original_report.MODULE_HEADER.encode()
+    
+    # Count module separators in the bytes actually written
+    with open(output_path, 'rb') as f:
+        output_size = os.fstat(f.fileno()).st_size
+        output_module_count = 0
+        if output_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = mm.find(sep)
+                while pos >= 0:
+                    output_module_count += 1
+                    pos = mm.find(sep, pos + len(sep))
     
     # Check module count
     original_module_count = len(original_report.module_order)
-    output_module_count = len(output_report.module_order)
     
     print(f"  Module count: {output_module_count} (expected: {original_module_count})", end="")
     if original_module_count == output_module_count:
@@ -304,11 +432,21 @@ def verify_report_integrity(original_report, output_file_path, description):
         print(f" MISMATCH!")
         return False
     
+    # Check file size: header, blank line, then each module preceded by a newline
+    expected_size = len(original_report.header) + len(nl) + sum(len(nl) + length for _, length in written_modules.values())
+    
+    print(f"  File size: {output_size} bytes (expected: {expected_size})", end="")
+    if output_size == expected_size:
+        print(" OK")
+    else:
+        print(f" MISMATCH!")
+        return False
+    
     # Check library count for each module
     mismatches = []
     for module_name in original_report.module_order:
         original_lib_count = original_report.get_library_count(module_name)
-        output_lib_count = output_report.get_library_count(module_name)
+        output_lib_count = written_modules.get(module_name, (0, 0))[0]
         
         if original_lib_count != output_lib_count:
             mismatches.append({
@@ -367,9 +505,11 @@ def main():
     new_order = report2.reorder_modules(report1.module_order)
     
     # Show statistics
-    common_modules = set(report1.module_order) & set(report2.module_order)
-    only_in_report1 = set(report1.module_order) - set(report2.module_order)
-    only_in_report2 = set(report2.module_order) - set(report1.module_order)
+    modules1 = set(report1.module_order)
+    modules2 = set(report2.module_order)
+    common_modules = modules1 & modules2
+    only_in_report1 = modules1 - modules2
+    only_in_report2 = modules2 - modules1
     
     print(f"\nStatistics:")
     print(f"  Common modules: {len(common_modules)}")
@@ -388,11 +528,11 @@ def main():
     
     # Save reordered report (driver only)
     print(f"\nSaving reordered report (driver only)...")
-    report2.save("BuildReport-reorder_driver.txt")
+    driver_only_modules = report2.save("BuildReport-reorder_driver.txt")
     
     # Save reordered report (driver and library)
     print(f"Saving reordered report (driver and library)...")
-    report2.save("BuildReport-reorder_driver_and_lib.txt", reorder_libraries=True, reference_report=report1)
+    driver_and_lib_modules = report2.save("BuildReport-reorder_driver_and_lib.txt", reorder_libraries=True, reference_report=report1)
     
     # Verify integrity
     print("\n" + "="*80)
@@ -402,12 +542,14 @@ def main():
     driver_only_ok = verify_report_integrity(
         report2,
         "BuildReport-reorder_driver.txt",
+        driver_only_modules,
         "BuildReport-reorder_driver.txt"
     )
     
     driver_and_lib_ok = verify_report_integrity(
         report2,
         "BuildReport-reorder_driver_and_lib.txt",
+        driver_and_lib_modules,
         "BuildReport-reorder_driver_and_lib.txt"
     )
     
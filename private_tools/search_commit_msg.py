@@ -4,13 +4,33 @@ Search for commits with specific messages across multiple Git/SVN repositories.
 """
 
 import os
+import re
 import sys
+import glob
+import json
+import time
+import hashlib
+import asyncio
 import subprocess
 import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from dataclasses import dataclass, asdict
+from typing import List, Optional, Tuple
+
+try:
+    # libxml2 based parser when installed; it offers the same pull parser API
+    from lxml import etree as ET
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAS_LXML = False
+
+# Configuration; search_commit_msg.json next to this script replaces the
+# list below, e.g. {"repositories": ["D:\\work\\repo", "D:\\work\\**\\.git"]}
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'search_commit_msg.json')
 
-# Configuration
 REPOSITORIES = [
     "D:\\work\\Grace\\code\\git2",
     "D:\\work\\Grace\\code\\g56\\trunk\\Board\\Nvidia\\ServerMultiBoardPkg",
@@ -23,171 +43,512 @@ REPOSITORIES = [
 ]
 
 SVN_LOG_LIMIT = 200
+GIT_READ_SIZE = 64 * 1024
+SVN_READ_SIZE = 64 * 1024
+MAX_PARALLEL_SEARCHES = 32
+
+# Results are cached per repository state, so a hit is always up to date;
+# git entries are extended incrementally and fully rescanned after CACHE_MAX_AGE
+CACHE_DIR = Path.home() / '.cache' / 'search_commit_msg'
+CACHE_MAX_AGE = 24 * 60 * 60
+CACHE_VERSION = 3
+
+# Characters with a special meaning in git's basic/extended --grep patterns
+REGEX_METACHARS = frozenset('.[]*^$\\+?(){}|')
 
+# git log -z output: one NUL terminated record per commit, fields split by %x1f
+GIT_LOG_FORMAT = '%H%x1f%an%x1f%ae%x1f%ad%x1f%B'
+GIT_RECORD_RE = re.compile(rb'([0-9a-f]{40,64})\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f([^\x1f]*)\x1f([^\0]*)\0')
+
+@dataclass(slots=True)
+class Commit:
+    """A matching commit; git commits have a hash/email, svn commits a revision"""
+    author: str
+    date: str
+    message: str
+    hash: str = ''
+    email: str = ''
+    revision: str = ''
+
+
+@functools.lru_cache(maxsize=None)
+def load_repositories(config_path: Optional[str] = None) -> Tuple[str, ...]:
+    """Load the repository list from the config file, expanding glob patterns once"""
+    if config_path is None:
+        # Only a missing default config falls back to the built-in list
+        if not os.path.exists(CONFIG_FILE):
+            return tuple(REPOSITORIES)
+        config_path = CONFIG_FILE
+    
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    
+    entries = config.get('repositories', []) if isinstance(config, dict) else None
+    if not isinstance(entries, list) or not all(isinstance(entry, str) for entry in entries):
+        raise ValueError("'repositories' must be a list of path strings")
+    
+    repositories = []
+    for entry in entries:
+        if not any(c in entry for c in '*?['):
+            # Plain paths are kept as-is so missing ones are still reported
+            repositories.append(entry)
+            continue
+        
+        for match in sorted(glob.glob(entry, recursive=True)):
+            # Patterns may point at the .git/.svn folder itself
+            if os.path.basename(match) in ('.git', '.svn'):
+                match = os.path.dirname(match)
+            repositories.append(match)
+    
+    # Overlapping patterns must not search a repository twice
+    return tuple(dict.fromkeys(repositories))
 
-def is_git_repo(path: str) -> bool:
-    """Check if the path is a Git repository"""
-    git_dir = os.path.join(path, '.git')
-    return os.path.isdir(git_dir)
 
+@functools.lru_cache(maxsize=None)
+def classify_repo(path: str) -> Optional[str]:
+    """Classify a working copy as 'git', 'svn' or None (raises OSError if missing)"""
+    # One directory read instead of a stat per .git/.svn probe; a .git file
+    # marks a linked worktree (or submodule) checkout
+    with os.scandir(path) as entries:
+        names = {entry.name for entry in entries if entry.is_dir() or entry.name == '.git'}
+    
+    if '.git' in names:
+        return 'git'
+    if '.svn' in names:
+        return 'svn'
+    return None
 
-def is_svn_repo(path: str) -> bool:
-    """Check if the path is an SVN repository"""
-    svn_dir = os.path.join(path, '.svn')
-    return os.path.isdir(svn_dir)
 
+@functools.lru_cache(maxsize=None)
+def git_common_dir(repo_path: str) -> str:
+    """Locate the git directory holding the objects and refs of a checkout"""
+    git_dir = os.path.join(repo_path, '.git')
+    
+    if os.path.isfile(git_dir):
+        # "gitdir: <path>" points at the worktree's private git directory,
+        # whose commondir file leads to the shared repository
+        with open(git_dir, encoding='utf-8') as f:
+            content = f.read().strip()
+        if content.startswith('gitdir:'):
+            git_dir = os.path.join(repo_path, content[len('gitdir:'):].strip())
+            commondir = os.path.join(git_dir, 'commondir')
+            if os.path.isfile(commondir):
+                with open(commondir, encoding='utf-8') as f:
+                    git_dir = os.path.join(git_dir, f.read().strip())
+    
+    return os.path.normcase(os.path.realpath(git_dir))
 
-def search_git_commits(repo_path: str, search_term: str) -> List[Dict]:
-    """Search for commits in a Git repository"""
+
+async def search_git_commits(repo_path: str, search_term: str, exclude: Optional[List[str]] = None,
+                             perl_regexp: bool = False) -> Optional[List[Commit]]:
+    """Search for commits in a Git repository, skipping history reachable from exclude (None on failure)"""
     results = []
     
     try:
-        # Use a unique separator to avoid conflicts
-        cmd = ['git', 'log', '--all', '--grep', search_term, '-i',
-               '--pretty=format:COMMIT_START%n%H%n%an%n%ae%n%ad%nMSG_START%n%B%nCOMMIT_END', '--date=iso']
+        # -z ends every commit with NUL; fields are split by the unit separator
+        cmd = ['git', 'log', '--all', '--grep', search_term, '-i', '-z',
+               f'--format={GIT_LOG_FORMAT}', '--date=iso']
+        if perl_regexp:
+            cmd.append('--perl-regexp')
+        elif not any(c in REGEX_METACHARS for c in search_term):
+            # A plain literal matches the same commits without the regex engine
+            cmd.append('--fixed-strings')
+        if exclude:
+            # Excluded tips go through stdin to stay clear of command line limits
+            cmd.append('--stdin')
         
-        result = subprocess.run(
-            cmd,
+        # Parse commits as git writes them instead of buffering the whole log
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
             cwd=repo_path,
+            stdin=subprocess.PIPE if exclude else subprocess.DEVNULL,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-            encoding='utf-8',
-            errors='ignore'
+            stderr=subprocess.DEVNULL
         )
         
-        if result.returncode == 0 and result.stdout.strip():
-            # Split by COMMIT_START marker
-            commits_raw = result.stdout.strip().split('COMMIT_START\n')
+        if exclude:
+            proc.stdin.write(''.join(f"^{tip}\n" for tip in exclude).encode('ascii'))
+            await proc.stdin.drain()
+            proc.stdin.close()
+        
+        # Records are matched on the raw bytes; only the kept fields are decoded
+        append = results.append
+        pending = b''
+        
+        while True:
+            chunk = await proc.stdout.read(GIT_READ_SIZE)
+            if not chunk:
+                break
             
-            for commit_block in commits_raw:
-                if not commit_block.strip():
-                    continue
-                
-                lines = commit_block.split('\n')
-                if len(lines) < 5:
-                    continue
-                
-                # Extract commit info
-                commit_hash = lines[0].strip()
-                author = lines[1].strip()
-                email = lines[2].strip()
-                date = lines[3].strip()
-                
-                # Find MSG_START and extract message
-                msg_start_idx = -1
-                for i, line in enumerate(lines):
-                    if line.strip() == 'MSG_START':
-                        msg_start_idx = i
-                        break
-                
-                if msg_start_idx == -1:
-                    continue
-                
-                # Get message lines (skip MSG_START and COMMIT_END)
-                message_lines = []
-                for i in range(msg_start_idx + 1, len(lines)):
-                    if lines[i].strip() == 'COMMIT_END':
-                        break
-                    message_lines.append(lines[i])
-                
-                # Join message and strip trailing empty lines
-                message = '\n'.join(message_lines).rstrip()
+            # Only parse up to the last complete record; keep the rest
+            data = pending + chunk
+            end = data.rfind(b'\0') + 1
+            pending = data[end:]
+            
+            for match in GIT_RECORD_RE.finditer(data, 0, end):
+                commit_hash, author, email, date, message = match.groups()
+                # Universal newlines as in a text mode pipe, then strip
+                # trailing empty lines of the message
+                message = message.decode('utf-8', errors='ignore')
+                message = message.replace('\r\n', '\n').replace('\r', '\n').rstrip()
                 
-                if commit_hash and message:
-                    results.append({
-                        'hash': commit_hash,
-                        'author': author,
-                        'email': email,
-                        'date': date,
-                        'message': message
-                    })
+                if message:
+                    append(Commit(
+                        hash=commit_hash.decode('ascii'),
+                        author=author.decode('utf-8', errors='ignore').strip(),
+                        email=email.decode('utf-8', errors='ignore').strip(),
+                        date=date.decode('utf-8', errors='ignore').strip(),
+                        message=message
+                    ))
+        
+        if await proc.wait() != 0:
+            # e.g. an invalid pattern, or -P with a git built without PCRE
+            print(f"Warning: git log failed for {repo_path} (exit code {proc.returncode})")
+            return None
         
     except Exception as e:
         print(f"Warning: Error searching Git repo {repo_path}: {e}")
+        return None
     
     return results
 
 
-def search_svn_commits(repo_path: str, search_term: str, log_limit: int = 100) -> List[Dict]:
-    """Search for commits in an SVN repository"""
+async def search_svn_commits(repo_path: str, search_term: str, log_limit: int = 100,
+                             perl_regexp: bool = False) -> Optional[List[Commit]]:
+    """Search for commits in an SVN repository (None if the search failed)"""
     results = []
     
     try:
+        if perl_regexp:
+            matches = re.compile(search_term, re.IGNORECASE).search
+        elif search_term.isascii():
+            # Case-insensitive scan without building a lowered copy of every message
+            matches = re.compile(re.escape(search_term), re.IGNORECASE).search
+        else:
+            search_lower = search_term.lower()
+            matches = lambda message: search_lower in message.lower()
+        
         cmd = ['svn', 'log', '--xml', '-l', str(log_limit)]
         
-        result = subprocess.run(
-            cmd,
+        # Parse the log as svn writes it; only matching entries are kept.
+        # stderr is only captured because network errors are reported there.
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
             cwd=repo_path,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-            encoding='utf-8',
-            errors='ignore'
+            stderr=subprocess.PIPE
         )
         
-        if result.returncode != 0:
-            # Check if it's a network error
-            if result.stderr and ('Unable to connect' in result.stderr or 'E731001' in result.stderr or '無法識別這台主機' in result.stderr):
-                print(f"Warning: Cannot connect to SVN server for {repo_path} - skipping")
-            else:
-                print(f"Warning: SVN log failed for {repo_path}: {result.stderr[:100]}")
-            return results
+        # Drain stderr alongside stdout so a chatty svn can never block on it
+        stderr_task = asyncio.create_task(proc.stderr.read())
         
-        if result.stdout.strip():
-            import xml.etree.ElementTree as ET
-            root = ET.fromstring(result.stdout)
-            
-            search_lower = search_term.lower()
+        if HAS_LXML:
+            parser = ET.XMLPullParser(events=('start', 'end'), collect_ids=False,
+                                      resolve_entities=False, huge_tree=False)
+        else:
+            parser = ET.XMLPullParser(events=('start', 'end'))
+        parse_error = None
+        root = None
+        
+        while True:
+            chunk = await proc.stdout.read(SVN_READ_SIZE)
+            if parse_error is not None:
+                # Keep draining so svn can exit and report its own error
+                if not chunk:
+                    break
+                continue
             
-            for logentry in root.findall('logentry'):
-                msg_elem = logentry.find('msg')
-                message = msg_elem.text if msg_elem is not None and msg_elem.text else ''
+            try:
+                if chunk:
+                    parser.feed(chunk)
+                else:
+                    parser.close()
                 
-                if search_lower in message.lower():
-                    author_elem = logentry.find('author')
-                    date_elem = logentry.find('date')
+                for event, elem in parser.read_events():
+                    if event == 'start':
+                        if root is None:
+                            root = elem
+                        continue
+                    
+                    if elem.tag != 'logentry':
+                        continue
+                    
+                    msg_elem = elem.find('msg')
+                    message = msg_elem.text if msg_elem is not None and msg_elem.text else ''
                     
-                    results.append({
-                        'revision': logentry.get('revision'),
-                        'author': author_elem.text if author_elem is not None else 'Unknown',
-                        'date': date_elem.text if date_elem is not None else 'Unknown',
-                        'message': message
-                    })
+                    if matches(message):
+                        author_elem = elem.find('author')
+                        date_elem = elem.find('date')
+                        
+                        results.append(Commit(
+                            revision=elem.get('revision'),
+                            author=author_elem.text if author_elem is not None else 'Unknown',
+                            date=date_elem.text if date_elem is not None else 'Unknown',
+                            message=message
+                        ))
+                    
+                    # Drop the processed entry so the tree never holds the whole log
+                    root.clear()
+            except ET.ParseError as e:
+                parse_error = e
+            
+            if not chunk:
+                break
+        
+        stderr = (await stderr_task).decode('utf-8', errors='ignore')
+        
+        if await proc.wait() != 0:
+            # Check if it's a network error
+            if stderr and ('Unable to connect' in stderr or 'E731001' in stderr or '無法識別這台主機' in stderr):
+                print(f"Warning: Cannot connect to SVN server for {repo_path} - skipping")
+            else:
+                print(f"Warning: SVN log failed for {repo_path}: {stderr[:100]}")
+            return None
+        
+        if parse_error is not None:
+            raise parse_error
         
     except Exception as e:
         print(f"Warning: Error searching SVN repo {repo_path}: {e}")
+        return None
     
     return results
 
 
-def print_results(repo_path: str, repo_type: str, commits: List[Dict], verbose: bool = False):
+async def run_command(cmd: List[str], cwd: str, stdin: Optional[bytes] = None) -> Optional[bytes]:
+    """Run a short helper command and return its stdout (None on failure)"""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd,
+            stdin=subprocess.PIPE if stdin is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        stdout, _ = await proc.communicate(stdin)
+    except OSError:
+        return None
+    
+    return stdout if proc.returncode == 0 else None
+
+
+async def get_repo_state(repo_path: str, repo_type: str) -> Optional[List[str]]:
+    """List what a search would see: every git ref and worktree HEAD, or the svn revision"""
+    if repo_type == 'svn':
+        stdout = await run_command(['svn', 'info', '--show-item', 'revision'], repo_path)
+        return stdout.decode('utf-8', errors='ignore').split() if stdout is not None else None
+    
+    # `git log --all` also follows the HEAD of every worktree
+    refs, worktrees = await asyncio.gather(
+        run_command(['git', 'rev-parse', '--all'], repo_path),
+        run_command(['git', 'worktree', 'list', '--porcelain'], repo_path))
+    if refs is None or worktrees is None:
+        return None
+    
+    heads = [line[5:].strip() for line in worktrees.decode('utf-8', errors='ignore').splitlines()
+             if line.startswith('HEAD ')]
+    return heads + refs.decode('utf-8', errors='ignore').split()
+
+
+async def is_fast_forward(repo_path: str, old_tips: List[str], new_tips: List[str]) -> bool:
+    """Check that every old tip is still reachable from the current refs"""
+    revs = ''.join(f"{tip}\n" for tip in old_tips) + ''.join(f"^{tip}\n" for tip in new_tips)
+    stdout = await run_command(['git', 'rev-list', '--count', '--stdin'], repo_path,
+                               stdin=revs.encode('ascii'))
+    return stdout is not None and stdout.strip() == b'0'
+
+
+async def search_repo(repo_path: str, repo_type: str, search_term: str,
+                      use_cache: bool = True, perl_regexp: bool = False) -> Optional[List[Commit]]:
+    """Search one repository, reusing and extending cached results where possible"""
+    state = await get_repo_state(repo_path, repo_type) if use_cache else None
+    if state is None:
+        if repo_type == 'git':
+            return await search_git_commits(repo_path, search_term, perl_regexp=perl_regexp)
+        return await search_svn_commits(repo_path, search_term, SVN_LOG_LIMIT, perl_regexp)
+    
+    key = (f"{CACHE_VERSION}|{repo_type}|{os.path.abspath(repo_path)}|{SVN_LOG_LIMIT}|"
+           f"{'perl' if perl_regexp else 'default'}|{search_term}")
+    cache_path = CACHE_DIR / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+    
+    cached = None
+    try:
+        entry = json.loads(cache_path.read_text(encoding='utf-8'))
+        if time.time() - entry['ts'] < CACHE_MAX_AGE and entry['state']:
+            entry['results'] = [Commit(**commit) for commit in entry['results']]
+            cached = entry
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    if cached is None:
+        # Expired or unreadable entries are dropped; a successful search rewrites them
+        try:
+            cache_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+    
+    if cached is not None and cached['state'] == state:
+        return cached['results']
+    
+    if repo_type == 'svn':
+        commits = await search_svn_commits(repo_path, search_term, SVN_LOG_LIMIT, perl_regexp)
+        ts = time.time()
+    elif cached is not None and await is_fast_forward(repo_path, cached['state'], state):
+        # Refs only moved forward: search just the new commits and keep the
+        # timestamp of the last full scan
+        commits = await search_git_commits(repo_path, search_term, exclude=cached['state'],
+                                           perl_regexp=perl_regexp)
+        if commits is not None:
+            commits += cached['results']
+        ts = cached['ts']
+    else:
+        commits = await search_git_commits(repo_path, search_term, perl_regexp=perl_regexp)
+        ts = time.time()
+    
+    # Failed searches are not cached; write via a temporary file so
+    # concurrent runs never read a partial entry
+    if commits is not None:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.tmp")
+            entry = {'ts': ts, 'state': state, 'results': [asdict(commit) for commit in commits]}
+            tmp_path.write_text(json.dumps(entry), encoding='utf-8')
+            tmp_path.replace(cache_path)
+        except OSError as e:
+            print(f"Warning: Cannot write search cache {cache_path}: {e}")
+    
+    return commits
+
+
+def prune_cache():
+    """Delete cache files not written within CACHE_MAX_AGE (entries of one-off searches)"""
+    cutoff = time.time() - CACHE_MAX_AGE
+    try:
+        paths = list(CACHE_DIR.iterdir())
+    except OSError:
+        return
+    for path in paths:
+        try:
+            if path.suffix in ('.json', '.tmp') and path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def print_results(repo_path: str, repo_type: str, commits: List[Commit], verbose: bool = False):
     """Print search results for a repository"""
     if not commits:
         return
     
-    print(f"")
-    print(f"Repository: {repo_path}")
+    # Build the whole block first and write it out in one call
+    buf = []
+    app = buf.append
+    
+    app(f"\n")
+    app(f"Repository: {repo_path}\n")
     if verbose:
-        print(f"Type: {repo_type.upper()}")
-        print(f"Found {len(commits)} commit(s)")
+        app(f"Type: {repo_type.upper()}\n")
+        app(f"Found {len(commits)} commit(s)\n")
     
     for i, commit in enumerate(commits, 1):
         if repo_type == 'git':
-            print(f"  Hash:    {commit['hash'][:12]}...")
-            print(f"  Author:  {commit['author']} <{commit['email']}>")
-            print(f"  Date:    {commit['date']}")
+            app(f"  Hash:    {commit.hash[:12]}...\n")
+            app(f"  Author:  {commit.author} <{commit.email}>\n")
+            app(f"  Date:    {commit.date}\n")
         else:  # SVN
-            print(f"  Revision: r{commit['revision']}")
-            print(f"  Author:   {commit['author']}")
-            print(f"  Date:     {commit['date']}")
+            app(f"  Revision: r{commit.revision}\n")
+            app(f"  Author:   {commit.author}\n")
+            app(f"  Date:     {commit.date}\n")
         
         # Print message with preserved formatting
-        message = commit['message']
-        print(f"  Message:")
-        for line in message.split('\n'):
-            print(f"    {line}")
-        print(f"")
+        message = commit.message
+        app(f"  Message:\n")
+        app("    " + message.replace('\n', '\n    ') + "\n")
+        app(f"\n")
+    
+    sys.stdout.write(''.join(buf))
+
+def _search_repo_process(repo_path: str, repo_type: str, search_term: str,
+                         use_cache: bool, perl_regexp: bool) -> Optional[List[Commit]]:
+    """Process pool entry point: search one repository in its own event loop"""
+    return asyncio.run(search_repo(repo_path, repo_type, search_term, use_cache, perl_regexp))
+
+
+async def search_repositories(repo_paths: List[str], search_term: str, verbose: bool = False,
+                              use_cache: bool = True, perl_regexp: bool = False,
+                              processes: bool = False) -> Tuple[int, int, int]:
+    """Search all repositories concurrently, reporting in order; returns (searched, skipped, commits)"""
+    total_commits = 0
+    searched_repos = 0
+    skipped_repos = 0
+    
+    repos = []
+    for repo_path in repo_paths:
+        try:
+            repos.append((repo_path, classify_repo(repo_path)))
+        except OSError:
+            repos.append((repo_path, None))
+    
+    # git/svn searches are I/O bound subprocesses, so start them all at once
+    # and report the outcomes in repo_paths order as they complete. With
+    # `processes`, each search (and its result parsing) runs in a worker
+    # process instead, for searches that return very many commits.
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_SEARCHES)
+    executor = None
+    if processes:
+        searchable = sum(1 for _, repo_type in repos if repo_type)
+        workers = min(searchable, max(1, (os.cpu_count() or 1) - 1))
+        if workers:
+            executor = ProcessPoolExecutor(max_workers=workers)
+    
+    async def limited(repo_path, repo_type):
+        async with semaphore:
+            if executor is not None:
+                return await asyncio.get_running_loop().run_in_executor(
+                    executor, _search_repo_process, repo_path, repo_type, search_term, use_cache, perl_regexp)
+            return await search_repo(repo_path, repo_type, search_term, use_cache, perl_regexp)
+    
+    # Worktrees of one repository share refs and objects, so `git log --all`
+    # sees the same history from each of them; search it only once
+    pending = []
+    searches = {}
+    for repo_path, repo_type in repos:
+        if repo_type:
+            try:
+                history = git_common_dir(repo_path) if repo_type == 'git' else None
+            except OSError:
+                history = None
+            key = (repo_type, history or os.path.normcase(os.path.realpath(repo_path)))
+            
+            if key not in searches:
+                searches[key] = asyncio.create_task(limited(repo_path, repo_type))
+            pending.append((repo_path, repo_type, searches[key]))
+        elif os.path.isdir(repo_path):
+            pending.append((repo_path, None, f"Skipping (not a Git/SVN repo): {repo_path}"))
+        else:
+            pending.append((repo_path, None, f"Skipping (not found): {repo_path}"))
+    
+    for repo_path, repo_type, outcome in pending:
+        commits = await outcome if repo_type else None
+        
+        if verbose:
+            print(f"Searching: {repo_path}")
+        
+        if repo_type is None:
+            print(outcome)
+            skipped_repos += 1
+            continue
+        
+        searched_repos += 1
+        
+        if commits:
+            print_results(repo_path, repo_type, commits, verbose)
+            total_commits += len(commits)
+    
+    if executor is not None:
+        executor.shutdown()
+    
+    return searched_repos, skipped_repos, total_commits
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -196,55 +557,44 @@ def main():
         epilog='''
 Examples:
   python search_commit_msg.py IBxxxx0001
+  python search_commit_msg.py -P "IB\\w{4}000[12]"
         '''
     )
     
     parser.add_argument('search_term', help='Term to search for in commit messages')
+    parser.add_argument('-c', '--config',
+                        help=f'JSON file listing the repositories to search (default: {CONFIG_FILE})')
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='Show detailed information (hash/revision, author, date)')
+    parser.add_argument('-P', '--perl-regexp', action='store_true',
+                        help='Treat the search term as a Perl-compatible regular expression')
+    parser.add_argument('--processes', action='store_true',
+                        help='Search each repository in a separate process (for very large result sets)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always run git/svn instead of reusing cached results')
     
     args = parser.parse_args()
     
-    if not REPOSITORIES:
+    try:
+        repositories = load_repositories(args.config)
+    except (OSError, ValueError) as e:
+        print(f"Error: Cannot load config {args.config or CONFIG_FILE}: {e}")
+        sys.exit(1)
+    
+    if not repositories:
         print("Error: No repositories configured")
         sys.exit(1)
     
     if args.verbose:
         print(f"Searching for: '{args.search_term}'")
-        print(f"Repositories to search: {len(REPOSITORIES)}")
+        print(f"Repositories to search: {len(repositories)}")
     
-    total_commits = 0
-    searched_repos = 0
-    skipped_repos = 0
+    if not args.no_cache:
+        prune_cache()
     
-    for repo_path in REPOSITORIES:
-        if args.verbose:
-            print(f"Searching: {repo_path}")
-        
-        if not os.path.isdir(repo_path):
-            print(f"Skipping (not found): {repo_path}")
-            skipped_repos += 1
-            continue
-        
-        repo_type = None
-        commits = []
-        
-        if is_git_repo(repo_path):
-            repo_type = 'git'
-            commits = search_git_commits(repo_path, args.search_term)
-        elif is_svn_repo(repo_path):
-            repo_type = 'svn'
-            commits = search_svn_commits(repo_path, args.search_term, SVN_LOG_LIMIT)
-        else:
-            print(f"Skipping (not a Git/SVN repo): {repo_path}")
-            skipped_repos += 1
-            continue
-        
-        searched_repos += 1
-        
-        if commits:
-            print_results(repo_path, repo_type, commits, args.verbose)
-            total_commits += len(commits)
+    searched_repos, skipped_repos, total_commits = asyncio.run(
+        search_repositories(repositories, args.search_term, args.verbose,
+                            not args.no_cache, args.perl_regexp, args.processes))
     
     if args.verbose:
         print(f"\n{'='*80}")